@@ -21,9 +21,38 @@ def validate_user_credentials_in_db(username: str, password: str) -> bool:
         cursor.execute("""
             SELECT 1
             FROM TicketUserMaster
-            WHERE UserName = ?
-              AND Password = ?
-        """, username, password)
+            WHERE UserName = %s
+              AND Password = %s
+        """, (username, password))
+
+        return cursor.fetchone() is not None
+
+    finally:
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+
+def validate_report_user_in_db(username: str, password: str) -> bool:
+    """
+    Like validate_user_credentials_in_db(), but only accepts users allowed
+    to see reports; scanner-only accounts are refused.
+    """
+    conn = None
+    cursor = None
+
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT 1
+            FROM TicketUserMaster
+            WHERE UserName = %s
+              AND Password = %s
+              AND IsReportVisible = 1
+        """, (username, password))
 
         return cursor.fetchone() is not None
 
@@ -0,0 +1,33 @@
+import os
+import redis
+from dotenv import load_dotenv
+from utils.utils import logger
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Caching is optional: without REDIS_URL every lookup is a miss
+redis_client = redis.Redis.from_url(REDIS_URL) if REDIS_URL else None
+
+
+def cache_get(key: str) -> bytes | None:
+    if redis_client is None:
+        return None
+
+    try:
+        return redis_client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Redis GET {key} failed: {e}")
+        return None
+
+
+def cache_set(key: str, ttl: int, value: bytes):
+    if redis_client is None:
+        return
+
+    try:
+        redis_client.setex(key, ttl, value)
+    except redis.RedisError as e:
+        logger.warning(f"Redis SETEX {key} failed: {e}")
+
@@ -1,21 +1,123 @@
 import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
 import os
+import time
+import threading
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_connection():
-    host = os.getenv("DB_SERVER")
-    port = int(os.getenv("DB_PORT", 3306))
-    database = os.getenv("DB_DATABASE")
-    username = os.getenv("DB_USERNAME")
-    password = os.getenv("DB_PASSWORD")
-
-    conn = mysql.connector.connect(
-        host=host,
-        port=port,
-        user=username,
-        password=password,
-        database=database
-    )
-    return conn
+DB_CONFIG = {
+    "host": os.getenv("DB_SERVER"),
+    "port": int(os.getenv("DB_PORT", 3306)),
+    "user": os.getenv("DB_USERNAME"),
+    "password": os.getenv("DB_PASSWORD"),
+    "database": os.getenv("DB_DATABASE")
+}
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+# The C extension builds fetchall() result lists in C; the pure-Python
+# protocol is only used when explicitly requested or under gevent.
+DB_USE_PURE = os.getenv("DB_USE_PURE", "0") == "1"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Compiled row -> dict comprehensions, keyed by column names
+_row_converters = {}
+
+
+def _socket_is_patched() -> bool:
+    """
+    The C extension talks to MySQL through libmysqlclient sockets, which
+    gevent cannot patch, so a query would block every greenlet.
+    """
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("socket")
+
+
+def _get_pool():
+    """
+    Build the connection pool on first use so the app can still start
+    (and report DOWN on /health) while the database is unreachable.
+    """
+    global _pool
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name="akadeet",
+                    pool_size=DB_POOL_SIZE,
+                    pool_reset_session=True,
+                    autocommit=True,
+                    use_pure=DB_USE_PURE or _socket_is_patched(),
+                    **DB_CONFIG
+                )
+    return _pool
+
+
+def get_connection(timeout=None):
+    """
+    Check out a pooled connection; conn.close() hands it back.
+
+    mysql-connector raises PoolError as soon as every connection is in
+    use, so wait up to `timeout` seconds (DB_POOL_TIMEOUT by default) for
+    one to be returned instead of failing the request during a burst.
+    """
+    pool = _get_pool()
+    if timeout is None:
+        timeout = DB_POOL_TIMEOUT
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            return pool.get_connection()
+        except PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.01)
+
+
+def rows_to_dicts(cursor) -> list[dict]:
+    """
+    Fetch the remaining rows of `cursor` as a list of dicts.
+
+    The comprehension is generated with the column names written out as a
+    dict literal, which skips the per-row zip() + dict() calls of
+    [dict(zip(columns, row)) for row in rows]. It is compiled once per
+    column set and reused by later queries with the same columns.
+    """
+    rows = cursor.fetchall()
+    columns = tuple(cursor.column_names)
+
+    code = _row_converters.get(columns)
+    if code is None:
+        source = "[{" + ", ".join(
+            f"{name!r}: r[{i}]" for i, name in enumerate(columns)
+        ) + "} for r in rows]"
+        code = _row_converters[columns] = compile(source, "<rows_to_dicts>", "eval")
+
+    return eval(code, {"rows": rows})
+
+
+@contextmanager
+def db_cursor(dictionary=False):
+    """
+    Yield a cursor on a pooled connection. The cursor is closed and the
+    connection handed back to the pool even when the block raises.
+    """
+    conn = get_connection()
+    try:
+        cursor = conn.cursor(dictionary=dictionary)
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+    finally:
+        conn.close()
@@ -0,0 +1,53 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    # No PyPy build; the app keeps Flask's stdlib-based provider
+    orjson = None
+
+HAVE_ORJSON = orjson is not None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Dates, Decimals and other non-native types are still handed to Flask's
+    default(), so responses are equivalent JSON. They are not byte-identical:
+    orjson writes non-ASCII text as raw UTF-8 where Flask's provider
+    escaped it (ensure_ascii).
+    """
+
+    def _encode(self, obj, sort_keys, indent, option=0) -> bytes:
+        option |= orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self._encode(
+            obj,
+            kwargs.get("sort_keys", self.sort_keys),
+            kwargs.get("indent")
+        ).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """
+        Build the response body straight from orjson's bytes instead of
+        decoding them to str in dumps() only for Werkzeug to encode them
+        back to UTF-8. Keeps Flask's trailing newline and indent rules.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+
+        return self._app.response_class(
+            self._encode(obj, self.sort_keys, indent, orjson.OPT_APPEND_NEWLINE),
+            mimetype=self.mimetype
+        )
@@ -0,0 +1,35 @@
+import atexit
+import redis
+from concurrent.futures import ThreadPoolExecutor
+from rq import Queue
+from core.cache import redis_client
+from utils.utils import logger
+
+# Jobs are picked up by `rq worker akadeet --url $REDIS_URL`
+task_queue = Queue("akadeet", connection=redis_client) if redis_client is not None else None
+
+# In-process fallback; bounded so a burst of payments queues up instead
+# of starting one thread each
+BG_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="bg")
+atexit.register(BG_POOL.shutdown, wait=False)
+
+
+def _log_failure(future):
+    e = future.exception()
+    if e is not None:
+        logger.error(f"Background task failed: {e}")
+
+
+def enqueue(func, *args):
+    """
+    Run func(*args) outside the request: on an RQ worker when Redis is
+    configured, otherwise on the BG_POOL threads of this process.
+    """
+    if task_queue is not None:
+        try:
+            task_queue.enqueue(func, *args)
+            return
+        except redis.RedisError as e:
+            logger.warning(f"Queueing {func.__name__} failed, running in-process: {e}")
+
+    BG_POOL.submit(func, *args).add_done_callback(_log_failure)
@@ -0,0 +1,9 @@
+import os
+
+# gevent workers monkey-patch the stdlib before main.py is imported, so
+# blocking MySQL / SMTP / Razorpay / Twilio calls yield to other requests
+# instead of holding the whole worker.
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "gevent"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_connections = int(os.getenv("WORKER_CONNECTIONS", 1000))
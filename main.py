@@ -1,35 +1,278 @@
-from flask import Flask, request, jsonify, abort
+from flask import Flask, Response, request, jsonify, abort
 from flask_cors import CORS
-from dotenv import load_dotenv
-from datetime import datetime
+from mysql.connector import errorcode
+from mysql.connector.errors import IntegrityError, PoolError
+from datetime import datetime, date
 import os
+import time
+from pathlib import Path
 import razorpay
-from threading import Thread
-
-from core.database import get_connection
-from services.mail_service import send_ticket_email, send_email
-from services.qr_pdf import create_ticket_pdf
-from services.whatsapp_service import send_whatsapp_with_pdf
-from api.validation_login import validate_user_credentials_in_db, validate_user_and_get_tickets
-from utils.utils import decrypt_qr_data, generate_qr_string
+import requests
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from threading import Lock
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from werkzeug.http import parse_date
+
+from core.database import get_connection, db_cursor, rows_to_dicts
+from core.cache import cache_get, cache_set
+from core.tasks import enqueue
+from core.json_provider import HAVE_ORJSON, ORJSONProvider
+from services.mail_service import send_email
+from services.notification_service import render_and_send_tickets
+from api.validation_login import (
+    validate_user_credentials_in_db,
+    validate_report_user_in_db,
+    validate_user_and_get_tickets
+)
+from utils.utils import logger, decrypt_qr_data, generate_qr_string
 
 
-load_dotenv()
+# .env is loaded by core.database on import
 EMAIL_HOST = os.getenv("EMAIL_HOST")
 EMAIL_PORT = int(os.getenv("EMAIL_PORT"))
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 EMAIL_FROM = os.getenv("EMAIL_FROM")
-IMAGE_BASE_PATH = os.path.join(os.getcwd(), "static", "ticket_images")
 IMAGE_BASE_URL = os.getenv("IMAGE_BASE_URL")  
-BASE_DIR = os.getcwd()
-IMAGE_BASE_PATH = os.path.join(BASE_DIR, "static", "ticket_images")
+BASE_DIR = Path(__file__).resolve().parent
+IMAGE_BASE_PATH = BASE_DIR / "static" / "ticket_images"
+IMAGE_BASE_PATH.mkdir(parents=True, exist_ok=True)
+# Keep-alive session so order calls reuse the TLS connection to Razorpay
+razorpay_session = requests.Session()
+razorpay_session.headers["Connection"] = "keep-alive"
+razorpay_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(total=2, backoff_factor=0.2)
+)
+razorpay_session.mount("http://", razorpay_adapter)
+razorpay_session.mount("https://", razorpay_adapter)
 razorpay_client = razorpay.Client(
+    session=razorpay_session,
     auth=(os.getenv("RAZORPAY_KEY_ID"), os.getenv("RAZORPAY_KEY_SECRET"))
 )
+# Seconds per Razorpay HTTP attempt, and the longest an order request
+# waits for the order while holding its transaction
+RAZORPAY_TIMEOUT = float(os.getenv("RAZORPAY_TIMEOUT", 10))
+# Razorpay API calls run here while the request thread talks to MySQL
+razorpay_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="razorpay")
+EVENT_LIST_CACHE_TTL = int(os.getenv("EVENT_LIST_CACHE_TTL", 60))
+HEALTH_CHECK_TTL = 2
+# Probes must answer quickly even when every pooled connection is busy
+HEALTH_POOL_TIMEOUT = 0.5
+RATE_CACHE_TTL = int(os.getenv("RATE_CACHE_TTL", 60))
+BANNER_CACHE_TTL = int(os.getenv("BANNER_CACHE_TTL", 300))
+EVENT_LIST_DEFAULT_LIMIT = 50
+EVENT_LIST_MAX_LIMIT = 200
+LIST_DEFAULT_PAGE_SIZE = 50
+LIST_MAX_PAGE_SIZE = 500
+
+# Columns rendered by the public event list; the rest are admin-only
+PUBLIC_EVENT_COLUMNS = (
+    "TicketMasterId",
+    "EventName",
+    "EventDate",
+    "EventDay",
+    "EventTime",
+    "Venue",
+    "Country",
+    "Currency",
+    "MaxLimit",
+    "EventPostpone",
+    "EventClose"
+)
+ADMIN_EVENT_COLUMNS = PUBLIC_EVENT_COLUMNS + (
+    "CountryCode",
+    "EntryDateTime",
+    "EntryUserMasterId",
+    "EnquiryToEmailId",
+    "BCCEmailId"
+)
+
+# Static SQL, built once at import and bound with %s parameters on every
+# call. Queries assembled per request (event list columns, the QR CASE
+# UPDATE) and the admin inserts still written for SQL Server stay inline.
+_SQL_FIRST_TICKET_RATE = """
+    SELECT TicketRate, MinimumTickets
+    FROM TicketClassification
+    WHERE TicketMasterId = %s
+    LIMIT 1
+"""
+_SQL_TICKET_RATE = """
+    SELECT TicketRate, MinimumTickets
+    FROM TicketClassification
+    WHERE TicketMasterId = %s AND TicketClassificationId = %s
+    LIMIT 1
+"""
+_SQL_INSERT_ENQUIRY = """
+    INSERT INTO TicketEnquiry
+    (
+        TicketMasterId,
+        MobileNo,
+        EmailId,
+        TicketCount,
+        TotalAmount,
+        EntryDateTime,
+        Name,
+        IsSend
+    )
+    SELECT %s, %s, %s, %s, tc.TicketRate * %s, %s, %s, 0
+    FROM (
+        SELECT TicketRate, MinimumTickets
+        FROM TicketClassification
+        WHERE TicketMasterId = %s
+        LIMIT 1
+    ) tc
+    WHERE tc.MinimumTickets <= %s
+"""
+_SQL_ENQUIRY_TOTAL = """
+    SELECT TotalAmount
+    FROM TicketEnquiry
+    WHERE TicketEnquiryId = %s
+"""
+_SQL_ADMIT_TICKET = """
+    UPDATE TicketIssueDetails
+    SET IsPersonEntered = 1,
+        EntryDateTime = %s
+    WHERE TicketIssueDetailsId = %s
+      AND COALESCE(IsPersonEntered, 0) = 0
+"""
+_SQL_TICKET_DETAILS_EXISTS = """
+    SELECT 1
+    FROM TicketIssueDetails
+    WHERE TicketIssueDetailsId = %s
+"""
+_SQL_INSERT_TICKET_ISSUE = """
+    INSERT INTO TicketIssue
+    (
+        TicketMasterId,
+        MobileNo,
+        EmailId,
+        TicketCount,
+        TotalAmount,
+        EntryDateTime,
+        Name,
+        TransactionId
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+_SQL_TICKET_ISSUE_WITH_IMAGES = """
+    SELECT
+        ti.TicketMasterId,
+        ti.MobileNo,
+        ti.EmailId,
+        ti.TicketCount,
+        ti.TotalAmount,
+        ti.Name,
+        ti.TransactionId,
+        tm.Image5,
+        tm.Image6
+    FROM TicketIssue ti
+    LEFT JOIN TicketMaster tm
+        ON tm.TicketMasterId = ti.TicketMasterId
+    WHERE ti.TicketIssueId = %s
+"""
+_SQL_SET_TRANSACTION_ID = """
+    UPDATE TicketIssue
+    SET TransactionId = %s
+    WHERE TicketIssueId = %s
+      AND LEFT(COALESCE(TransactionId, ''), 4) <> 'pay_'
+"""
+_SQL_INSERT_TICKET_DETAILS = "INSERT INTO TicketIssueDetails (TicketIssueId) VALUES (%s)"
+_SQL_COUNT_UPCOMING_EVENTS = "SELECT COUNT(*) FROM TicketMaster WHERE EventDate >= %s"
+_SQL_EVENT_RATES = """
+    SELECT
+        tm.TicketMasterId,
+        tm.EventName,
+        tc.TicketClassificationId,
+        tc.TicketType,
+        tc.TicketRate,
+        tc.MinimumTickets
+    FROM TicketMaster tm
+    INNER JOIN TicketClassification tc
+        ON tm.TicketMasterId = tc.TicketMasterId
+    WHERE tm.TicketMasterId = %s
+"""
+_SQL_BANNER_IMAGES = """
+    SELECT
+        Image1,
+        Image2,
+        Image3,
+        Image4,
+        Image5,
+        Image6
+    FROM TicketMaster
+    WHERE TicketMasterId = %s
+"""
+_SQL_INSERT_STALL_BOOKING = """
+    INSERT INTO StallBookingMaster
+    (
+        EventMasterId,
+        TenantName,
+        TenantBrandName,
+        TenantEmail,
+        TenantContactNo,
+        SocialMediaLink,
+        CategoryId,
+        IsExecutedBefore,
+        SpecialRequirement,
+        EntryUserMasterId
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+_SQL_STALL_BOOKING_LIST = """
+    SELECT
+        sbm.StallBookingMasterId,
+        tm.EventName AS EventName,
+        sbm.TenantName,
+        sbm.TenantBrandName,
+        sbm.TenantEmail,
+        sbm.TenantContactNo,
+        sbm.SocialMediaLink,
+        cm.CategoryName AS CategoryName,
+        sbm.IsExecutedBefore,
+        sbm.SpecialRequirement,
+        sbm.EntryDateTime
+    FROM StallBookingMaster sbm
+    LEFT JOIN TicketMaster tm
+        ON sbm.EventMasterId = tm.TicketMasterId
+    LEFT JOIN CategoryMaster cm
+        ON sbm.CategoryId = cm.CategoryMasterId
+"""
+_SQL_SPONSOR_LIST = """
+    SELECT
+        sm.SponsorMasterId,
+        tm.EventName AS EventName,
+        sm.SponsorName,
+        sm.SponsorCompanyName,
+        sm.SponsorContactNo,
+        sm.SponsorEmail,
+        sm.ContactPersonName,
+        sm.ContactPersonDesignation,
+        sm.ContactPersonEmail,
+        sm.ContactPersonMobile,
+        sm.BusinessCategory,
+        sm.ApproximateBudget,
+        sm.InterestedSponsorCategory,
+        sm.EntryDateTime
+    FROM SponsorMaster sm
+    LEFT JOIN TicketMaster tm
+        ON sm.EventMasterId = tm.TicketMasterId
+"""
+_SQL_TICKET_DETAILS_IDS = """
+    SELECT TicketIssueDetailsId
+    FROM TicketIssueDetails
+    WHERE TicketIssueId = %s
+      AND TicketIssueDetailsId >= %s
+    ORDER BY TicketIssueDetailsId
+"""
 
 
 app = Flask(__name__)
+if HAVE_ORJSON:
+    app.json = ORJSONProvider(app)
 CORS(app, origins=[
     "https://akadeet.com",
     "https://www.akadeet.com",
@@ -47,106 +290,151 @@ def handle_http_exception(e: HTTPException):
     return jsonify({"detail": e.detail}), e.status_code
 
 
+# The URL map does not change after startup, so the listing is rendered once
+_routes_json = None
+
+
 @app.route("/", methods=["GET"])
 def list_only_project_routes():
-    routes = []
+    global _routes_json
 
-    for rule in app.url_map.iter_rules():
-        if rule.endpoint == "static":
-            continue
-        methods = sorted(m for m in rule.methods if m not in ("HEAD", "OPTIONS"))
-        routes.append({"path": str(rule), "methods": methods})
+    if _routes_json is None:
+        routes = []
+
+        for rule in app.url_map.iter_rules():
+            if rule.endpoint == "static":
+                continue
+            methods = sorted(m for m in rule.methods if m not in ("HEAD", "OPTIONS"))
+            routes.append({"path": str(rule), "methods": methods})
+
+        _routes_json = app.json.response({
+            "app": "AKADIT API",
+            "status": "running",
+            "total_routes": len(routes),
+            "routes": routes
+        }).get_data()
+
+    return Response(_routes_json, mimetype="application/json")
+
+# A successful DB check is reused for HEALTH_CHECK_TTL seconds
+_db_ok_until = 0.0
 
-    return {
-        "app": "AKADIT API",
-        "status": "running",
-        "total_routes": len(routes),
-        "routes": routes
-    }
 
 @app.route("/health", methods=["GET"])
 def health():
+    global _db_ok_until
+
+    if time.monotonic() < _db_ok_until:
+        return {"status": "UP", "db": "connected", "cached": True}
+
     try:
-        conn = get_connection()
-        conn.close()
-        return {"status": "UP", "db": "connected"}
+        conn = get_connection(timeout=HEALTH_POOL_TIMEOUT)
+    except PoolError as e:
+        return {"status": "DOWN", "db": "busy", "error": str(e)}
     except Exception as e:
         return {"status": "DOWN", "error": str(e)}
 
-@app.route("/getEventList", methods=["GET"])
-def get_ticketmaster():
-    conn = get_connection()
-    cursor = conn.cursor()
+    try:
+        conn.ping(reconnect=True, attempts=1, delay=0)
+    except Exception as e:
+        return {"status": "DOWN", "error": str(e)}
+    finally:
+        conn.close()
+
+    _db_ok_until = time.monotonic() + HEALTH_CHECK_TTL
+    return {"status": "UP", "db": "connected"}
+
 
-    query = """
+def _event_list_page(params):
+    """
+    Clamped (limit, offset) from `params`: the query string of the public
+    list, the JSON body of the admin one. Invalid values use the defaults.
+    """
+    try:
+        limit = int(params.get("limit", EVENT_LIST_DEFAULT_LIMIT))
+    except (TypeError, ValueError):
+        limit = EVENT_LIST_DEFAULT_LIMIT
+    try:
+        offset = int(params.get("offset", 0))
+    except (TypeError, ValueError):
+        offset = 0
+    return max(1, min(limit, EVENT_LIST_MAX_LIMIT)), max(0, offset)
+
+
+def _fetch_event_list(columns, today, limit, offset):
+    """
+    (total_records, rows) for one page of upcoming events. total_records
+    counts every event from today on, not just the rows of this page, so
+    clients can page through the list with ?limit= and ?offset=.
+    """
+    query = f"""
     SELECT
-        TicketMasterId,
-        EventDate,
-        EventDay,
-        Venue,
-        Country,
-        CountryCode,
-        Currency,
-        EntryDateTime,
-        EntryUserMasterId,
-        MaxLimit,
-        EnquiryToEmailId,
-        BCCEmailId,
-        EventPostpone,
-        EventClose,
-        EventName,
-        EventTime
+        {", ".join(columns)}
     FROM TicketMaster
-    WHERE EventDate >= CURDATE() 
-    ORDER BY EventDate ASC
+    WHERE EventDate >= %s
+    ORDER BY EventDate ASC, TicketMasterId ASC
+    LIMIT %s OFFSET %s
     """
 
-    cursor.execute(query)
+    with db_cursor() as cursor:
+        cursor.execute(_SQL_COUNT_UPCOMING_EVENTS, (today,))
+        (total_records,) = cursor.fetchone()
 
-    columns = [col[0] for col in cursor.description]
-    rows = cursor.fetchall()
+        cursor.execute(query, (today, limit, offset))
+        return total_records, rows_to_dicts(cursor)
 
-    data = [dict(zip(columns, row)) for row in rows]
 
-    conn.close()
+@app.route("/getEventList", methods=["GET"])
+def get_ticketmaster():
+    limit, offset = _event_list_page(request.args)
 
-    return {
-        "total_records": len(data),
+    today = date.today()
+
+    cache_key = f"events:list:v4:{today:%Y%m%d}:{limit}:{offset}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return Response(cached, mimetype="application/json")
+
+    total_records, data = _fetch_event_list(PUBLIC_EVENT_COLUMNS, today, limit, offset)
+
+    response = app.json.response({
+        "total_records": total_records,
         "tickets": data
-    }
+    })
+    cache_set(cache_key, EVENT_LIST_CACHE_TTL, response.get_data())
 
+    return response
 
-@app.route("/getEventTicketRate/<int:ticket_master_id>", methods=["GET"])
-def get_event_rates(ticket_master_id: int):
-    conn = get_connection()
-    cursor = conn.cursor()
 
-    query = """
-        SELECT
-            tm.TicketMasterId,
-            tm.EventName,
-            tc.TicketClassificationId,
-            tc.TicketType,
-            tc.TicketRate,
-            tc.MinimumTickets
-        FROM TicketMaster tm
-        INNER JOIN TicketClassification tc
-            ON tm.TicketMasterId = tc.TicketMasterId
-        WHERE tm.TicketMasterId = ?
-    """
+@app.route("/admin/getEventList", methods=["POST"])
+def get_ticketmaster_admin():
+    body = request.get_json(force=True)
 
-    cursor.execute(query, ticket_master_id)
+    if not validate_report_user_in_db(body.get("username"), body.get("password")):
+        return {
+            "success": False,
+            "message": "Invalid username or password"
+        }
 
-    columns = [col[0] for col in cursor.description]
-    rows = cursor.fetchall()
+    limit, offset = _event_list_page(body)
+    total_records, data = _fetch_event_list(
+        ADMIN_EVENT_COLUMNS, date.today(), limit, offset
+    )
 
-    if not rows:
-        conn.close()
-        return {"message": "No data found for this event"}
+    return {
+        "total_records": total_records,
+        "tickets": data
+    }
 
-    data = [dict(zip(columns, row)) for row in rows]
 
-    conn.close()
+@app.route("/getEventTicketRate/<int:ticket_master_id>", methods=["GET"])
+def get_event_rates(ticket_master_id: int):
+    with db_cursor() as cursor:
+        cursor.execute(_SQL_EVENT_RATES, (ticket_master_id,))
+        data = rows_to_dicts(cursor)
+
+    if not data:
+        return {"message": "No data found for this event"}
 
     return {
         "TicketMasterId": ticket_master_id,
@@ -163,6 +451,35 @@ def get_event_rates(ticket_master_id: int):
     }
 
 
+# (ticket_master_id, ticket_classification_id) -> (TicketRate, MinimumTickets)
+_rate_cache = TTLCache(maxsize=1024, ttl=RATE_CACHE_TTL)
+_rate_cache_lock = Lock()
+
+
+def _get_ticket_rate(cursor, ticket_master_id, ticket_classification_id):
+    """
+    (TicketRate, MinimumTickets) of the given ticket classification, or
+    None when the event has no such classification. Found rates are
+    cached for RATE_CACHE_TTL seconds; misses are not, so new rates show
+    up immediately.
+    """
+    key = (ticket_master_id, ticket_classification_id)
+
+    with _rate_cache_lock:
+        row = _rate_cache.get(key)
+    if row is not None:
+        return row
+
+    cursor.execute(_SQL_TICKET_RATE, (ticket_master_id, ticket_classification_id))
+    row = cursor.fetchone()
+
+    if row is not None:
+        with _rate_cache_lock:
+            _rate_cache[key] = row
+
+    return row
+
+
 # =========================
 # SAVE ENQUIRY API
 # =========================
@@ -183,66 +500,45 @@ def save_ticket_enquiry():
 
     try:
         # =========================
-        # 1. GET TICKET RATE
+        # 1. INSERT ENQUIRY
+        # Rate lookup, minimum check and total are evaluated by
+        # MySQL inside the INSERT, so they cannot race each other
         # =========================
-        cursor.execute("""
-            SELECT TicketRate, MinimumTickets
-            FROM TicketClassification
-            WHERE TicketMasterId = %s
-            LIMIT 1
-        """, (ticket_master_id,))
-
-        rate_row = cursor.fetchone()
+        cursor.execute(_SQL_INSERT_ENQUIRY, (
+            ticket_master_id,
+            mobile_no,
+            email_id,
+            ticket_count,
+            ticket_count,
+            datetime.now(),
+            name,
+            ticket_master_id,
+            ticket_count
+        ))
 
-        if not rate_row:
-            raise HTTPException(status_code=404, detail="Ticket rate not found")
+        if cursor.rowcount == 0:
+            # =========================
+            # 2. NOTHING INSERTED: NO RATE OR TOO FEW TICKETS
+            # =========================
+            cursor.execute(_SQL_FIRST_TICKET_RATE, (ticket_master_id,))
+            rate_row = cursor.fetchone()
 
-        ticket_rate = rate_row[0]
-        minimum_tickets = rate_row[1]
+            if not rate_row:
+                raise HTTPException(status_code=404, detail="Ticket rate not found")
 
-        # =========================
-        # 2. VALIDATE MINIMUM TICKETS
-        # =========================
-        if ticket_count < minimum_tickets:
             raise HTTPException(
                 status_code=400,
-                detail=f"Minimum {minimum_tickets} tickets required"
+                detail=f"Minimum {rate_row[1]} tickets required"
             )
 
-        # =========================
-        # 3. CALCULATE TOTAL
-        # =========================
-        total_amount = ticket_rate * ticket_count
+        conn.commit()
 
         # =========================
-        # 4. INSERT ENQUIRY
+        # 3. RESPONSE FROM THE STORED ROW
         # =========================
-        cursor.execute("""
-            INSERT INTO TicketEnquiry
-            (
-                TicketMasterId,
-                MobileNo,
-                EmailId,
-                TicketCount,
-                TotalAmount,
-                EntryDateTime,
-                Name,
-                IsSend
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """,
-        (
-            ticket_master_id,
-            mobile_no,
-            email_id,
-            ticket_count,
-            total_amount,
-            datetime.now(),
-            name,
-            0
-        ))
-
-        conn.commit()
+        cursor.execute(_SQL_ENQUIRY_TOTAL, (cursor.lastrowid,))
+        (total_amount,) = cursor.fetchone()
+        ticket_rate = total_amount / ticket_count
 
         return {
             "status": "success",
@@ -252,6 +548,9 @@ def save_ticket_enquiry():
             "message": "Ticket enquiry saved successfully"
         }
 
+    except HTTPException:
+        raise
+
     except Exception as e:
         conn.rollback()
         return {"status": "error", "detail": str(e)}, 500
@@ -261,39 +560,6 @@ def save_ticket_enquiry():
         conn.close()
 
 
-def send_email_and_whatsapp(
-    email_id,
-    name,
-    mobile_no,
-    entry_datetime,
-    ticket_count,
-    total_amount,
-    pdf_files
-):
-    # EMAIL
-    send_ticket_email(
-        email_id,
-        name,
-        mobile_no,
-        entry_datetime,
-        ticket_count,
-        total_amount,
-        "USD",
-        "Event Name",
-        None,
-        pdf_files
-    )
-
-    # WHATSAPP (ONE MESSAGE PER TICKET)
-    for i, pdf in enumerate(pdf_files, start=1):
-        send_whatsapp_with_pdf(
-            mobile_no=mobile_no,
-            pdf_file=pdf,
-            ticket_no=i,
-            total_tickets=ticket_count
-        )
-
-
 @app.route("/qrScanner", methods=["POST"])
 def scan_qr():
     body = request.get_json(force=True)
@@ -328,39 +594,30 @@ def scan_qr():
         conn = get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT IsPersonEntered
-            FROM TicketIssueDetails
-            WHERE TicketIssueDetailsId = ?
-        """, details_id)
+        # ----------------------------
+        # 5. Mark entry only if not used yet; the check and the
+        #    update are one atomic statement, so two scanners can
+        #    never both admit the same ticket
+        # ----------------------------
+        cursor.execute(_SQL_ADMIT_TICKET, (datetime.now(), details_id))
 
-        row = cursor.fetchone()
+        if cursor.rowcount == 0:
+            # ----------------------------
+            # 6. Nothing updated: unknown or already used
+            # ----------------------------
+            cursor.execute(_SQL_TICKET_DETAILS_EXISTS, (details_id,))
 
-        if not row:
-            return {
-                "status": 2,
-                "message": "Invalid ticket"
-            }
+            if cursor.fetchone() is None:
+                return {
+                    "status": 2,
+                    "message": "Invalid ticket"
+                }
 
-        # ----------------------------
-        # 5. Already used
-        # ----------------------------
-        if row.IsPersonEntered:
             return {
                 "status": 1,
                 "message": "Ticket already used"
             }
 
-        # ----------------------------
-        # 6. Mark entry
-        # ----------------------------
-        cursor.execute("""
-            UPDATE TicketIssueDetails
-            SET IsPersonEntered = 1,
-                EntryDateTime = GETDATE()
-            WHERE TicketIssueDetailsId = ?
-        """, details_id)
-
         conn.commit()
 
         # ----------------------------
@@ -431,6 +688,33 @@ def scanner_login():
     }
 
 
+# ticket_master_id -> (Image1, ..., Image6)
+_banner_cache = TTLCache(maxsize=512, ttl=BANNER_CACHE_TTL)
+_banner_cache_lock = Lock()
+
+
+def _banner_row(ticket_master_id):
+    """
+    Banner image file names of an event, or None when it does not exist.
+    Rows are cached for BANNER_CACHE_TTL seconds, so an image changed by
+    an admin shows up on the banner within that time.
+    """
+    with _banner_cache_lock:
+        row = _banner_cache.get(ticket_master_id)
+    if row is not None:
+        return row
+
+    with db_cursor() as cursor:
+        cursor.execute(_SQL_BANNER_IMAGES, (ticket_master_id,))
+        row = cursor.fetchone()
+
+    if row is not None:
+        with _banner_cache_lock:
+            _banner_cache[ticket_master_id] = row
+
+    return row
+
+
 @app.route("/banner_image", methods=["POST"])
 def get_event_by_master_id():
     body = request.get_json(force=True)
@@ -438,41 +722,30 @@ def get_event_by_master_id():
     if body.get("ticket_master_id", 0) <= 0:
         raise HTTPException(status_code=400, detail="Invalid TicketMasterId")
 
-    conn = get_connection()
-    cursor = conn.cursor()
-
     try:
-        cursor.execute("""
-            SELECT
-                Image1,
-                Image2,
-                Image3,
-                Image4,
-                Image5,
-                Image6
-            FROM TicketMaster
-            WHERE TicketMasterId = ?
-        """, (body.get("ticket_master_id"),))
-
-        row = cursor.fetchone()
+        row = _banner_row(body.get("ticket_master_id"))
 
         if row is None:
             raise HTTPException(status_code=404, detail="Event not found")
 
-        images = {}
-        for i in range(1, 7):
-            img = getattr(row, f"Image{i}", None)
-            images[f"image{i}"] = f"{IMAGE_BASE_URL}/{body.get('ticket_master_id')}/{img}" if img else None
+        image1, image2, image3, image4, image5, image6 = row
+        prefix = f"{IMAGE_BASE_URL}/{body.get('ticket_master_id')}/"
 
-        return {"images": images}
+        return {"images": {
+            "image1": prefix + image1 if image1 else None,
+            "image2": prefix + image2 if image2 else None,
+            "image3": prefix + image3 if image3 else None,
+            "image4": prefix + image4 if image4 else None,
+            "image5": prefix + image5 if image5 else None,
+            "image6": prefix + image6 if image6 else None
+        }}
+
+    except HTTPException:
+        raise
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-    finally:
-        cursor.close()
-        conn.close()
-
 @app.route("/addStallMaster", methods=["POST"])
 def add_stall_master():
     body = request.get_json(force=True)
@@ -577,6 +850,13 @@ def add_category():
 @app.route("/addStallBookingMaster", methods=["POST"])
 def add_stall_booking_master():
     body = request.get_json(force=True)
+
+    if not body.get("EventMasterId"):
+        return {
+            "status": 0,
+            "message": "EventMasterId is required"
+        }, 400
+
     conn = None
     cursor = None
 
@@ -585,39 +865,10 @@ def add_stall_booking_master():
         cursor = conn.cursor()
 
         # --------------------------------
-        # 1. CHECK EVENT EXISTS
-        # --------------------------------
-        cursor.execute(
-            "SELECT TicketMasterId FROM TicketMaster WHERE TicketMasterId = %s",
-            (body.get("EventMasterId"),)
-        )
-        if cursor.fetchone() is None:
-            return {
-                "status": 0,
-                "message": "Invalid EventMasterId. Event not found."
-            }, 400
-
-        # --------------------------------
-        # 2. INSERT STALL BOOKING
+        # 1. INSERT STALL BOOKING
         # EntryDateTime is AUTO (DEFAULT CURRENT_TIMESTAMP)
+        # The event is validated by FOREIGN KEY fk_sbm_event
         # --------------------------------
-        insert_query = """
-            INSERT INTO StallBookingMaster
-            (
-                EventMasterId,
-                TenantName,
-                TenantBrandName,
-                TenantEmail,
-                TenantContactNo,
-                SocialMediaLink,
-                CategoryId,
-                IsExecutedBefore,
-                SpecialRequirement,
-                EntryUserMasterId
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-
         insert_values = (
             body.get("EventMasterId"),
             body.get("TenantName"),
@@ -631,17 +882,21 @@ def add_stall_booking_master():
             body.get("EntryUserMasterId")
         )
 
-        cursor.execute(insert_query, insert_values)
-        conn.commit()
+        try:
+            cursor.execute(_SQL_INSERT_STALL_BOOKING, insert_values)
+        except IntegrityError as e:
+            if e.errno != errorcode.ER_NO_REFERENCED_ROW_2 or "fk_sbm_event" not in e.msg:
+                raise
+            return {
+                "status": 0,
+                "message": "Invalid EventMasterId. Event not found."
+            }, 400
 
-        # --------------------------------
-        # 3. GET LAST INSERT ID (MySQL)
-        # --------------------------------
-        cursor.execute("SELECT LAST_INSERT_ID()")
-        stall_booking_id = cursor.fetchone()[0]
+        stall_booking_id = cursor.lastrowid
+        conn.commit()
 
         # --------------------------------
-        # 4. SEND CONFIRMATION EMAIL
+        # 2. SEND CONFIRMATION EMAIL
         # --------------------------------
         if body.get("TenantEmail"):
             email_subject = "Stall Booking Confirmed"
@@ -661,7 +916,7 @@ Special Requirement: {body.get('SpecialRequirement')}
 Thank you,
 Event Management Team
 """
-            send_email(body.get("TenantEmail"), email_subject, email_body)
+            enqueue(send_email, body.get("TenantEmail"), email_subject, email_body)
 
         return {
             "status": 1,
@@ -685,42 +940,71 @@ Event Management Team
 
 
 
+def _list_page():
+    """
+    LIMIT / OFFSET for ?page= (1-based) and ?page_size= on admin lists.
+    """
+    page_size = request.args.get("page_size", LIST_DEFAULT_PAGE_SIZE, type=int)
+    page_size = max(1, min(page_size, LIST_MAX_PAGE_SIZE))
+    page = max(1, request.args.get("page", 1, type=int))
+    return page_size, (page - 1) * page_size
+
+
+def _list_window(entry_column, id_column):
+    """
+    WHERE / ORDER BY / LIMIT tail and parameters of a newest-first admin
+    list. With ?after_ts= and ?after_id= (EntryDateTime and id of the last
+    row already seen) the page starts right after that row, so deep pages
+    cost the same as the first one; otherwise ?page= / ?page_size= apply.
+
+    after_ts is EntryDateTime as the list renders it (an HTTP date such as
+    "Tue, 02 Jan 2024 03:04:05 GMT", which carries the stored value
+    unchanged) or ISO 8601 without a UTC offset ("2024-01-02T03:04:05").
+    EntryDateTime is stored without a time zone, so offsets are rejected.
+    """
+    page_size, offset = _list_page()
+    order = f"ORDER BY {entry_column} DESC, {id_column} DESC"
+
+    after_ts = request.args.get("after_ts")
+    after_id = request.args.get("after_id", type=int)
+    if not after_ts or after_id is None:
+        return f"{order} LIMIT %s OFFSET %s", (page_size, offset)
+
+    try:
+        after = datetime.fromisoformat(after_ts)
+    except ValueError:
+        # Flask renders naive datetimes as HTTP dates labelled GMT
+        after = parse_date(after_ts)
+        if after is None:
+            raise HTTPException(status_code=400, detail="Invalid after_ts")
+        after = after.replace(tzinfo=None)
+    else:
+        if after.tzinfo is not None:
+            raise HTTPException(
+                status_code=400,
+                detail="after_ts must not carry a UTC offset"
+            )
+
+    # Expanded rather than (a, b) < (x, y) so MySQL uses a range scan
+    where = (
+        f"WHERE {entry_column} < %s"
+        f" OR ({entry_column} = %s AND {id_column} < %s)"
+    )
+    return f"{where} {order} LIMIT %s", (after, after, after_id, page_size)
+
+
 @app.route("/getStallBookingMasters", methods=["GET"])
 def get_stall_booking_masters():
+    window, params = _list_window("sbm.EntryDateTime", "sbm.StallBookingMasterId")
     conn = None
     cursor = None
     try:
         conn = get_connection()
         cursor = conn.cursor()
 
-        query = """
-            SELECT 
-                sbm.StallBookingMasterId,
-                tm.EventName AS EventName,
-                sbm.TenantName,
-                sbm.TenantBrandName,
-                sbm.TenantEmail,
-                sbm.TenantContactNo,
-                sbm.SocialMediaLink,
-                cm.CategoryName AS CategoryName,
-                sbm.IsExecutedBefore,
-                sbm.SpecialRequirement,
-                sbm.EntryDateTime
-            FROM StallBookingMaster sbm
-            LEFT JOIN TicketMaster tm
-                ON sbm.EventMasterId = tm.TicketMasterId
-            LEFT JOIN CategoryMaster cm
-                ON sbm.CategoryId = cm.CategoryMasterId
-            ORDER BY sbm.EntryDateTime DESC
-        """
-        cursor.execute(query)
-        rows = cursor.fetchall()
-
-        # Convert rows to list of dicts
-        columns = [col[0] for col in cursor.description]
-        result = [dict(zip(columns, row)) for row in rows]
+        cursor.execute(_SQL_STALL_BOOKING_LIST + window, params)
 
-        return result
+        return rows_to_dicts(cursor)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -735,6 +1019,10 @@ def get_stall_booking_masters():
 @app.route("/addSponsorMaster", methods=["POST"])
 def add_sponsor_master():
     body = request.get_json(force=True)
+
+    if not body.get("EventMasterId"):
+        raise HTTPException(status_code=400, detail="EventMasterId is required")
+
     conn = None
     cursor = None
     try:
@@ -818,11 +1106,11 @@ Regards,
 Event Management Team
 """
 
-            send_email(body.get("ContactPersonEmail"), email_subject, email_body)
+            enqueue(send_email, body.get("ContactPersonEmail"), email_subject, email_body)
 
         return {
             "status": 1,
-            "message": "Sponsor added successfully and email sent",
+            "message": "Sponsor added successfully",
             "SponsorMasterId": int(sponsor_master_id)
         }
 
@@ -838,38 +1126,16 @@ Event Management Team
 
 @app.route("/getSponsorMasters", methods=["GET"])
 def get_sponsor_masters():
+    window, params = _list_window("sm.EntryDateTime", "sm.SponsorMasterId")
     conn = None
     cursor = None
     try:
         conn = get_connection()
-        cursor = conn.cursor(dictionary=True)  # return dicts directly
-
-        query = """
-            SELECT
-                sm.SponsorMasterId,
-                tm.EventName AS EventName,
-                sm.SponsorName,
-                sm.SponsorCompanyName,
-                sm.SponsorContactNo,
-                sm.SponsorEmail,
-                sm.ContactPersonName,
-                sm.ContactPersonDesignation,
-                sm.ContactPersonEmail,
-                sm.ContactPersonMobile,
-                sm.BusinessCategory,
-                sm.ApproximateBudget,
-                sm.InterestedSponsorCategory,
-                sm.EntryDateTime
-            FROM SponsorMaster sm
-            LEFT JOIN TicketMaster tm
-                ON sm.EventMasterId = tm.TicketMasterId
-            ORDER BY sm.EntryDateTime DESC
-        """
+        cursor = conn.cursor()
 
-        cursor.execute(query)
-        rows = cursor.fetchall()
+        cursor.execute(_SQL_SPONSOR_LIST + window, params)
 
-        return rows 
+        return rows_to_dicts(cursor)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -884,58 +1150,54 @@ def get_sponsor_masters():
 @app.route("/ticket/addTicketIssue", methods=["POST"])
 def create_razorpay_order():
     body = request.get_json(force=True)
+
+    try:
+        ticket_count = int(body.get("ticket_count", 0))
+    except (TypeError, ValueError):
+        ticket_count = 0
+    if (
+        not body.get("ticket_master_id")
+        or body.get("ticket_classification_id") is None
+        or ticket_count <= 0
+    ):
+        return {"status": "error", "detail": "Invalid ticket"}, 400
+
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
         # 1️⃣ Get ticket rate and minimum tickets
-        cursor.execute("""
-            SELECT TicketRate, MinimumTickets
-            FROM TicketClassification
-            WHERE TicketMasterId = %s AND TicketClassificationId = %s
-            LIMIT 1
-        """, (
+        row = _get_ticket_rate(
+            cursor,
             body.get("ticket_master_id"),
             body.get("ticket_classification_id")
-        ))
-
-        row = cursor.fetchone()
+        )
         if not row:
             return {"status": "error", "detail": "Invalid ticket"}, 400
 
         rate = float(row[0])
         min_tickets = int(row[1])
 
-        ticket_count = int(body.get("ticket_count", 0))
         if ticket_count < min_tickets:
             return {"status": "error", "detail": f"Minimum {min_tickets} tickets required"}, 400
 
         total_amount = rate * ticket_count
         total_amount_paise = int(total_amount * 100)
 
-        # 2️⃣ Create Razorpay order
-        razorpay_order = razorpay_client.order.create({
-            "amount": total_amount_paise,
-            "currency": "INR",
-            "receipt": f"TICKET_{body.get('mobile_no')}"
-        })
-        
+        # 2️⃣ Create Razorpay order; the HTTP call overlaps the INSERT below
+        razorpay_future = razorpay_executor.submit(
+            razorpay_client.order.create,
+            {
+                "amount": total_amount_paise,
+                "currency": "INR",
+                "receipt": f"TICKET_{body.get('mobile_no')}"
+            },
+            timeout=RAZORPAY_TIMEOUT
+        )
 
-        # 3️⃣ Insert into TicketIssue
-        cursor.execute("""
-            INSERT INTO TicketIssue
-            (
-                TicketMasterId,
-                MobileNo,
-                EmailId,
-                TicketCount,
-                TotalAmount,
-                EntryDateTime,
-                Name,
-                TransactionId
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-        """, (
+        # 3️⃣ Insert into TicketIssue; committed only once the order exists
+        conn.start_transaction()
+        cursor.execute(_SQL_INSERT_TICKET_ISSUE, (
             body.get("ticket_master_id"),
             body.get("mobile_no"),
             body.get("email_id"),
@@ -947,6 +1209,8 @@ def create_razorpay_order():
         ))
 
         ticket_issue_id = cursor.lastrowid  # MySQL way to get inserted ID
+
+        razorpay_order = razorpay_future.result(timeout=RAZORPAY_TIMEOUT)
         conn.commit()
 
         # 4️⃣ Return both IDs for frontend
@@ -955,6 +1219,10 @@ def create_razorpay_order():
             "ticket_issue_id": ticket_issue_id
         }
 
+    except FuturesTimeoutError:
+        conn.rollback()
+        return {"status": "error", "detail": "Payment gateway timed out"}, 504
+
     except Exception as e:
         conn.rollback()
         return {"status": "error", "detail": str(e)}, 500
@@ -967,22 +1235,24 @@ def create_razorpay_order():
 @app.route("/ticket/verifyPayment", methods=["POST"])
 def verify_payment():
     body = request.get_json(force=True)
+
+    if not body.get("ticket_issue_id") or not body.get("razorpay_payment_id"):
+        return {
+            "status": 0,
+            "message": "ticket_issue_id and razorpay_payment_id are required"
+        }
+
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
-        cursor.execute("""
-            SELECT
-                TicketMasterId,
-                MobileNo,
-                EmailId,
-                TicketCount,
-                TotalAmount,
-                Name,
-                TransactionId
-            FROM TicketIssue
-            WHERE TicketIssueId = ?
-        """, body.get("ticket_issue_id"))
+        # ----------------------------
+        # Ticket issue + event images in one round-trip
+        # ----------------------------
+        cursor.execute(
+            _SQL_TICKET_ISSUE_WITH_IMAGES,
+            (body.get("ticket_issue_id"),)
+        )
 
         row = cursor.fetchone()
         if not row:
@@ -991,13 +1261,17 @@ def verify_payment():
                 "message": "TicketIssue not found"
             }
 
-        ticket_master_id = row.TicketMasterId
-        mobile_no = row.MobileNo
-        email_id = row.EmailId
-        ticket_count = row.TicketCount
-        total_amount = row.TotalAmount
-        name = row.Name
-        existing_transaction = row.TransactionId
+        (
+            ticket_master_id,
+            mobile_no,
+            email_id,
+            ticket_count,
+            total_amount,
+            name,
+            existing_transaction,
+            image5,
+            image6
+        ) = row
         entry_datetime = datetime.now()
 
         if existing_transaction and existing_transaction.startswith("pay_"):
@@ -1006,90 +1280,66 @@ def verify_payment():
                 "message": "Payment already processed"
             }
 
-        # ----------------------------
-        # Get Ticket Images 
-        # ----------------------------
-        cursor.execute("""
-            SELECT Image5, Image6
-            FROM TicketMaster
-            WHERE TicketMasterId = ?
-        """, ticket_master_id)
-
-        img_row = cursor.fetchone()
-        image5_path = None
-        image6_path = None
-
-        if img_row:
-            if img_row.Image5:
-                image5_path = os.path.join(IMAGE_BASE_PATH, img_row.Image5)
-            if img_row.Image6:
-                image6_path = os.path.join(IMAGE_BASE_PATH, img_row.Image6)
-
-        cursor.execute("""
-            UPDATE TicketIssue
-            SET TransactionId = ?
-            WHERE TicketIssueId = ?
-        """, (
+        image5_path = IMAGE_BASE_PATH / image5 if image5 else None
+        image6_path = IMAGE_BASE_PATH / image6 if image6 else None
+
+        # Autocommit is on; the ticket writes below must land together
+        conn.start_transaction()
+
+        # Only the first verify of an order claims it; a concurrent
+        # one waits for the row lock and then updates nothing
+        cursor.execute(_SQL_SET_TRANSACTION_ID, (
             body.get("razorpay_payment_id"),
             body.get("ticket_issue_id")
         ))
 
-        pdf_files = []
-
-        for i in range(1, ticket_count + 1):
+        if cursor.rowcount == 0:
+            conn.rollback()
+            return {
+                "status": 0,
+                "message": "Payment already processed"
+            }
 
-            cursor.execute("""
-                INSERT INTO TicketIssueDetails (TicketIssueId)
-                OUTPUT INSERTED.TicketIssueDetailsId
-                VALUES (?)
-            """, body.get("ticket_issue_id"))
+        # ----------------------------
+        # Create all ticket rows in one INSERT: mysql-connector's
+        # executemany() rewrites INSERT ... VALUES into a single
+        # multi-row statement. The ids of this batch are read back
+        # rather than derived from LAST_INSERT_ID(), which is only
+        # safe with auto_increment_increment = 1.
+        # ----------------------------
+        cursor.executemany(
+            _SQL_INSERT_TICKET_DETAILS,
+            [(body.get("ticket_issue_id"),)] * ticket_count
+        )
 
-            details_id = int(cursor.fetchone()[0])
+        cursor.execute(
+            _SQL_TICKET_DETAILS_IDS,
+            (body.get("ticket_issue_id"), cursor.lastrowid)
+        )
+        details_ids = [details_id for (details_id,) in cursor.fetchall()]
 
-            qr_string = generate_qr_string(
-                body.get("ticket_issue_id"),
-                details_id
-            )
+        qr_strings = [
+            generate_qr_string(body.get("ticket_issue_id"), details_id)
+            for details_id in details_ids
+        ]
 
-            cursor.execute("""
-                UPDATE TicketIssueDetails
-                SET QRCode = ?
-                WHERE TicketIssueDetailsId = ?
-            """, (qr_string, details_id))
-
-            pdf_path = create_ticket_pdf(
-                ticket_issue_id=body.get("ticket_issue_id"),
-                ticket_master_id=ticket_master_id,
-                country_code="91",
-                mobile_no=mobile_no,
-                name=name,
-                ticket_no=i,
-                total_tickets=ticket_count,
-                details_id=details_id,
-                qr_code=qr_string,
-                image5_path=image5_path, 
-                image6_path=image6_path   
-            )
+        # ----------------------------
+        # Store every QR code with a single UPDATE
+        # ----------------------------
+        qr_params = []
+        for details_id, qr_string in zip(details_ids, qr_strings):
+            qr_params += [details_id, qr_string]
 
-            pdf_files.append(pdf_path)
+        cursor.execute(
+            "UPDATE TicketIssueDetails SET QRCode = CASE TicketIssueDetailsId "
+            + " ".join(["WHEN %s THEN %s"] * len(details_ids))
+            + " END WHERE TicketIssueDetailsId IN ("
+            + ", ".join(["%s"] * len(details_ids)) + ")",
+            qr_params + details_ids
+        )
 
         conn.commit()
 
-        Thread(target=send_email_and_whatsapp, args=(
-            email_id,
-            name,
-            mobile_no,
-            entry_datetime,
-            ticket_count,
-            total_amount,
-            pdf_files
-        ), daemon=True).start()
-
-        return {
-            "status": 1,
-            "message": "Payment verified and tickets issued successfully"
-        }
-
     except Exception as e:
         conn.rollback()
         return {
@@ -1101,6 +1351,36 @@ def verify_payment():
         cursor.close()
         conn.close()
 
+    # ----------------------------
+    # The payment and tickets are committed from here on, so a
+    # delivery problem must not be reported as a failed payment.
+    # PDFs are rendered and sent by the background job.
+    # ----------------------------
+    try:
+        enqueue(
+            render_and_send_tickets,
+            body.get("ticket_issue_id"),
+            ticket_master_id,
+            email_id,
+            name,
+            mobile_no,
+            entry_datetime,
+            total_amount,
+            details_ids,
+            qr_strings,
+            image5_path,
+            image6_path
+        )
+    except Exception as e:
+        logger.error(
+            f"Queueing tickets of TicketIssue {body.get('ticket_issue_id')} failed: {e}"
+        )
+
+    return {
+        "status": 1,
+        "message": "Payment verified and tickets issued successfully"
+    }
+
 @app.route("/addTicketEnquiry", methods=["GET"])
 def get_ticket_enquiry():
 
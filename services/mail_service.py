@@ -8,6 +8,12 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+EMAIL_FROM = os.getenv("EMAIL_FROM")
+SMTP_HOST = os.getenv("EMAIL_HOST")
+SMTP_PORT = int(os.getenv("EMAIL_PORT"))
+SMTP_USER = os.getenv("EMAIL_USER")
+SMTP_PASSWORD = os.getenv("EMAIL_PASSWORD")
+
 
 def send_ticket_email(
     to_email: str,
@@ -23,7 +29,7 @@ def send_ticket_email(
 ):
     msg = MIMEMultipart("alternative")
 
-    msg["From"] = os.getenv("EMAIL_FROM")
+    msg["From"] = EMAIL_FROM
     msg["To"] = to_email
     msg["Subject"] = f"Ticket - {event_name} {mobile_no}"
 
@@ -96,15 +102,9 @@ def send_ticket_email(
     # -------------------------
     # Send Email
     # -------------------------
-    with smtplib.SMTP(
-        os.getenv("EMAIL_HOST"),
-        int(os.getenv("EMAIL_PORT"))
-    ) as server:
+    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
         server.starttls()
-        server.login(
-            os.getenv("EMAIL_USER"),
-            os.getenv("EMAIL_PASSWORD")
-        )
+        server.login(SMTP_USER, SMTP_PASSWORD)
         server.send_message(msg)
 
     return True
@@ -112,7 +112,7 @@ def send_ticket_email(
 
 def send_stall_booking_email(to_email: str, full_name: str, stall_no: str):
     msg = MIMEMultipart()
-    msg["From"] = os.getenv("EMAIL_FROM")
+    msg["From"] = EMAIL_FROM
     msg["To"] = to_email
     msg["Subject"] = "Stall Booking Confirmation"
 
@@ -129,24 +129,20 @@ Regards,
 Event Management Team
 """
     msg.attach(MIMEText(body, "plain"))
-    SMTP_HOST = os.getenv("EMAIL_HOST")
-    SMTP_PORT = int(os.getenv("EMAIL_PORT"))
     with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
         server.starttls()
-        server.login(os.getenv("EMAIL_USER"), os.getenv("EMAIL_PASSWORD"))
+        server.login(SMTP_USER, SMTP_PASSWORD)
         server.send_message(msg)
 
 def send_email(to_email: str, subject: str, body: str):
     msg = MIMEMultipart()
-    msg["From"] = os.getenv("EMAIL_FROM")
+    msg["From"] = EMAIL_FROM
     msg["To"] = to_email
     msg["Subject"] = subject
 
     msg.attach(MIMEText(body, "plain"))
-    SMTP_HOST = os.getenv("EMAIL_HOST")
-    SMTP_PORT = int(os.getenv("EMAIL_PORT"))
     with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
         server.starttls()
-        server.login(os.getenv("EMAIL_USER"), os.getenv("EMAIL_PASSWORD"))
+        server.login(SMTP_USER, SMTP_PASSWORD)
         server.send_message(msg)
     return True
\ No newline at end of file
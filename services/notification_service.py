@@ -0,0 +1,117 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from services.mail_service import send_ticket_email
+from services.whatsapp_service import send_whatsapp_with_pdf
+from services.qr_pdf import create_ticket_pdf, load_ticket_image, ticket_pdf_path
+from utils.utils import logger
+
+WHATSAPP_SEND_WORKERS = 10
+PDF_RENDER_WORKERS = 8
+
+
+def send_email_and_whatsapp(
+    email_id,
+    name,
+    mobile_no,
+    entry_datetime,
+    ticket_count,
+    total_amount,
+    pdf_files
+):
+    # EMAIL
+    send_ticket_email(
+        email_id,
+        name,
+        mobile_no,
+        entry_datetime,
+        ticket_count,
+        total_amount,
+        "USD",
+        "Event Name",
+        None,
+        pdf_files
+    )
+
+    # WHATSAPP (ONE MESSAGE PER TICKET, SENT CONCURRENTLY)
+    if not pdf_files:
+        return
+
+    def send_ticket(ticket_no, pdf):
+        send_whatsapp_with_pdf(
+            mobile_no=mobile_no,
+            pdf_file=pdf,
+            ticket_no=ticket_no,
+            total_tickets=ticket_count
+        )
+
+    with ThreadPoolExecutor(max_workers=min(WHATSAPP_SEND_WORKERS, len(pdf_files))) as executor:
+        list(executor.map(send_ticket, range(1, len(pdf_files) + 1), pdf_files))
+
+
+def render_and_send_tickets(
+    ticket_issue_id,
+    ticket_master_id,
+    email_id,
+    name,
+    mobile_no,
+    entry_datetime,
+    total_amount,
+    details_ids,
+    qr_strings,
+    image5_path=None,
+    image6_path=None
+):
+    """
+    Render one PDF per issued ticket and deliver them by email and
+    WhatsApp. Runs as a background job after the payment is committed;
+    a failed job stays in RQ's failed registry and can be requeued to
+    resend the tickets. PDFs already rendered by an earlier run of the
+    job are reused, so a resend only delivers them again.
+    """
+    ticket_count = len(details_ids)
+
+    try:
+        # The header image is read from disk once for all tickets
+        image5_data = load_ticket_image(image5_path)
+
+        def render_ticket(ticket_no, details_id, qr_string):
+            pdf_file = ticket_pdf_path(details_id)
+            if os.path.exists(pdf_file):
+                return pdf_file
+
+            return create_ticket_pdf(
+                ticket_issue_id=ticket_issue_id,
+                ticket_master_id=ticket_master_id,
+                country_code="91",
+                mobile_no=mobile_no,
+                name=name,
+                ticket_no=ticket_no,
+                total_tickets=ticket_count,
+                details_id=details_id,
+                qr_code=qr_string,
+                image5_path=image5_path,
+                image6_path=image6_path,
+                image5_data=image5_data
+            )
+
+        with ThreadPoolExecutor(max_workers=min(PDF_RENDER_WORKERS, ticket_count)) as executor:
+            pdf_files = list(executor.map(
+                render_ticket,
+                range(1, ticket_count + 1),
+                details_ids,
+                qr_strings
+            ))
+
+        send_email_and_whatsapp(
+            email_id,
+            name,
+            mobile_no,
+            entry_datetime,
+            ticket_count,
+            total_amount,
+            pdf_files
+        )
+
+    except Exception as e:
+        logger.error(f"Sending tickets of TicketIssue {ticket_issue_id} failed: {e}")
+        raise
@@ -1,5 +1,7 @@
 import os
+import io
 import qrcode
+from qrcode.exceptions import DataOverflowError
 from reportlab.lib.pagesizes import mm
 from reportlab.pdfgen import canvas
 from reportlab.lib.utils import ImageReader
@@ -13,6 +15,31 @@ PDF_PATH = os.getenv("PDF_PATH", "./pdfs")
 os.makedirs(QR_PATH, exist_ok=True)
 os.makedirs(PDF_PATH, exist_ok=True)
 
+# QR version that fitted the last payload of a given length. Ticket
+# payloads all have about the same length, so the best_fit() search only
+# runs once per process.
+_qr_versions = {}
+
+
+def _make_qr_image(data):
+    key = (len(data), qrcode.constants.ERROR_CORRECT_Q)
+    version = _qr_versions.get(key)
+
+    qr = qrcode.QRCode(version=version, error_correction=qrcode.constants.ERROR_CORRECT_Q)
+    qr.add_data(data)
+
+    try:
+        qr.make(fit=version is None)
+    except DataOverflowError:
+        # Same length but a denser segment mix; search again
+        qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_Q)
+        qr.add_data(data)
+        qr.make(fit=True)
+
+    _qr_versions[key] = qr.version
+
+    return qr.make_image(fill_color="black", back_color="white")
+
 
 def generate_qr_code(ticket_master_id, country_code, mobile_no, details_id):
     details_id = int(details_id)
@@ -21,11 +48,7 @@ def generate_qr_code(ticket_master_id, country_code, mobile_no, details_id):
     qr_raw = f"{ticket_master_id}{country_code}{mobile_no}{details_str}"
     encrypted_text = encrypt_qr_data(qr_raw)
 
-    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_Q)
-    qr.add_data(encrypted_text)
-    qr.make(fit=True)
-
-    img = qr.make_image(fill_color="black", back_color="white")
+    img = _make_qr_image(encrypted_text)
     qr_file = os.path.join(QR_PATH, f"qr_{details_str}.png")
     img.save(qr_file)
 
@@ -38,17 +61,31 @@ def generate_qr_code_with_details(ticket_master_id, country_code, mobile_no, det
     qr_raw = f"{ticket_master_id}{country_code}{mobile_no}{details_str}"
     encrypted_text = encrypt_qr_data(qr_raw)
 
-    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_Q)
-    qr.add_data(encrypted_text)
-    qr.make(fit=True)
-
-    img = qr.make_image(fill_color="black", back_color="white")
+    img = _make_qr_image(encrypted_text)
     qr_file = os.path.join(QR_PATH, f"qr_{details_str}.png")
     img.save(qr_file)
 
     return qr_file, encrypted_text
 
 
+def ticket_pdf_path(details_id):
+    return os.path.join(PDF_PATH, f"ticket_{details_id}.pdf")
+
+
+def load_ticket_image(path):
+    """
+    Bytes of a ticket background image, or None when the file does not
+    exist. Read once per order; each PDF wraps them in its own
+    ImageReader, since a reader's file handle cannot be shared between
+    rendering threads.
+    """
+    if not path or not os.path.exists(path):
+        return None
+
+    with open(path, "rb") as f:
+        return f.read()
+
+
 def create_ticket_pdf(
     ticket_issue_id,
     ticket_master_id,
@@ -60,27 +97,34 @@ def create_ticket_pdf(
     qr_code,
     details_id,
     image5_path=None,
-    image6_path=None
+    image6_path=None,
+    image5_data=None
 ):
     qr_path = generate_qr_code(
         ticket_master_id, country_code, mobile_no, details_id
     )
 
-    pdf_file = os.path.join(PDF_PATH, f"ticket_{details_id}.pdf")
+    pdf_file = ticket_pdf_path(details_id)
+    # Written under a temporary name and renamed once complete, so an
+    # existing ticket_<id>.pdf is always a whole ticket
+    tmp_file = f"{pdf_file}.tmp"
 
     PAGE_WIDTH = 80 * mm
     PAGE_HEIGHT = 200 * mm
 
-    c = canvas.Canvas(pdf_file, pagesize=(PAGE_WIDTH, PAGE_HEIGHT))
+    c = canvas.Canvas(tmp_file, pagesize=(PAGE_WIDTH, PAGE_HEIGHT))
 
     # ==================================================
     # BACKGROUND IMAGE (TOP HEADER ONLY)
     # ==================================================
     HEADER_HEIGHT = 116 * mm
 
-    if image5_path and os.path.exists(image5_path):
+    if image5_data is None:
+        image5_data = load_ticket_image(image5_path)
+
+    if image5_data is not None:
         c.drawImage(
-            ImageReader(image5_path),
+            ImageReader(io.BytesIO(image5_data)),
             0,
             PAGE_HEIGHT - HEADER_HEIGHT,
             PAGE_WIDTH,
@@ -131,7 +175,6 @@ def create_ticket_pdf(
 
     c.showPage()
     c.save()
-
+    os.replace(tmp_file, pdf_file)
 
     return pdf_file
-
@@ -0,0 +1,23 @@
+-- Indexes backing the API's hot queries (MySQL).
+
+-- /getEventList: range on EventDate, ordered by (EventDate, TicketMasterId)
+CREATE INDEX idx_eventdate ON TicketMaster (EventDate);
+
+-- /getEventTicketRate: lookup by TicketMasterId served from the index alone
+CREATE INDEX idx_tc_master_covering
+    ON TicketClassification (TicketMasterId, TicketClassificationId, TicketType, TicketRate, MinimumTickets);
+
+-- /addStallBookingMaster: the event must exist; replaces the pre-insert SELECT
+ALTER TABLE StallBookingMaster
+    ADD CONSTRAINT fk_sbm_event
+    FOREIGN KEY (EventMasterId) REFERENCES TicketMaster (TicketMasterId);
+
+-- /getStallBookingMasters and /getSponsorMasters: newest-first listing
+-- read in index order (backward scan) instead of a filesort. MySQL has
+-- no INCLUDE columns; the primary key is implicitly part of each index,
+-- so the ?after_ts=&after_id= keyset page is a range on (EntryDateTime, id).
+CREATE INDEX ix_sbm_entry ON StallBookingMaster (EntryDateTime);
+CREATE INDEX ix_sm_entry ON SponsorMaster (EntryDateTime);
+
+-- TicketClassification(TicketMasterId) lookups from /addTicketEnquiry and
+-- /ticket/addTicketIssue use the leading column of idx_tc_master_covering.
@@ -12,6 +12,9 @@ load_dotenv()
 # -----------------------------
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 ENCRPYTION_KEY = os.getenv("ENCRYPTION_KEY", "ThisIsA16ByteKey!")[:16].encode("utf-8")
+QR_PAYLOAD_KEY = os.getenv("ENCRPYTION_KEY")
+# ECB keeps no state between blocks, so one cipher object serves every call
+QR_CIPHER = AES.new(ENCRPYTION_KEY, AES.MODE_ECB)
 
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL, logging.INFO),
@@ -29,11 +32,10 @@ def encrypt_qr_data(data: str) -> str:
     Used only for obfuscation + tamper detection.
     """
 
-    key = os.getenv("ENCRPYTION_KEY")
-    if not key:
+    if not QR_PAYLOAD_KEY:
         raise RuntimeError("ENCRPYTION_KEY is not set in environment")
 
-    payload = f"{data}|{key}"
+    payload = f"{data}|{QR_PAYLOAD_KEY}"
     encoded = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("utf-8")
     return encoded
 
@@ -56,9 +58,7 @@ def decrypt_qr_data(encoded_data: str) -> str:
         raise ValueError("Invalid QR payload")
 
     data, key = decoded_str.rsplit("|", 1)
-    expected_key = os.getenv("ENCRPYTION_KEY")
-
-    if key != expected_key:
+    if key != QR_PAYLOAD_KEY:
         logger.warning("QR validation failed: Key mismatch")
         raise ValueError("Invalid or tampered QR code")
 
@@ -70,12 +70,10 @@ def generate_qr_string(ticket_issue_id: int, details_id: int) -> str:
     """
     raw_payload = f"{ticket_issue_id}|{details_id}|{int(datetime.utcnow().timestamp())}"
 
-    cipher = AES.new(ENCRPYTION_KEY, AES.MODE_ECB)
-
     padded_data = raw_payload.encode("utf-8")
     padded_data += b" " * (16 - len(padded_data) % 16)
 
-    encrypted = cipher.encrypt(padded_data)
+    encrypted = QR_CIPHER.encrypt(padded_data)
 
     return base64.b64encode(encrypted).decode("utf-8")
 
@@ -89,8 +87,7 @@ def decrypt_qr_data(encrypted_data: str) -> str:
         encrypted_bytes = base64.b64decode(encrypted_data)
 
         # Step 2: AES decrypt
-        cipher = AES.new(ENCRYPTION_KEY, AES.MODE_ECB)
-        decrypted = cipher.decrypt(encrypted_bytes)
+        decrypted = QR_CIPHER.decrypt(encrypted_bytes)
 
         # Step 3: Remove padding
         decoded = decrypted.decode("utf-8").rstrip(" ")